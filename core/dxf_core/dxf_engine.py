@@ -5,12 +5,66 @@ from typing import Iterable, List, Optional, Sequence, Tuple
 
 import ezdxf
 import numpy as np
+import shapely
+from shapely import STRtree
 from shapely.geometry import LinearRing, LineString, Polygon
 from shapely.geometry.base import BaseGeometry
 from shapely.ops import unary_union
+from shapely.prepared import prep
 
-Point = Tuple[float, float]
-PointList = Tuple[bool, List[Point], str]
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the NumPy kernels below are used instead
+    njit = None
+
+PointList = Tuple[bool, np.ndarray, str]
+
+# Maximum distance between an arc and its approximating chords, in mm.
+ARC_TOL_MM = 0.05
+# Upper bound on segments per full circle, so huge radii stay cheap.
+ARC_MAX_SEGMENTS = 4096
+# Douglas-Peucker tolerance for contours, in mm; far below CNC accuracy.
+SIMPLIFY_TOL_MM = 0.01
+
+
+def _approx_arc_numpy(cx: float, cy: float, r: float, sa: float, ea: float, n: int) -> np.ndarray:
+    angles = np.linspace(sa, ea, n)
+    return np.column_stack((cx + r * np.cos(angles), cy + r * np.sin(angles)))
+
+
+def _filter_nan_numpy(pts: np.ndarray) -> np.ndarray:
+    return pts[~np.isnan(pts).any(axis=1)]
+
+
+if njit is not None:
+
+    @njit(cache=True, fastmath=True)
+    def _approx_arc_kernel(cx, cy, r, sa, ea, n):
+        out = np.empty((n, 2))
+        step = (ea - sa) / (n - 1) if n > 1 else 0.0
+        for i in range(n):
+            a = sa + i * step
+            out[i, 0] = cx + r * math.cos(a)
+            out[i, 1] = cy + r * math.sin(a)
+        return out
+
+    # No fastmath here: it lets LLVM assume NaNs never occur.
+    @njit(cache=True)
+    def _filter_nan(pts):
+        out = np.empty_like(pts)
+        keep = 0
+        for i in range(pts.shape[0]):
+            x = pts[i, 0]
+            y = pts[i, 1]
+            if not (math.isnan(x) or math.isnan(y)):
+                out[keep, 0] = x
+                out[keep, 1] = y
+                keep += 1
+        return out[:keep]
+
+else:
+    _approx_arc_kernel = _approx_arc_numpy
+    _filter_nan = _filter_nan_numpy
 
 
 @dataclass
@@ -33,67 +87,120 @@ def units_to_mm_factor(insunits: Optional[int]) -> Optional[float]:
     return mapping.get(insunits)
 
 
-def approx_arc(cx: float, cy: float, r: float, start_angle: float, end_angle: float, pts: int = 120) -> List[Point]:
+def approx_arc(cx: float, cy: float, r: float, start_angle: float, end_angle: float, tol_mm: float = ARC_TOL_MM) -> np.ndarray:
     sa = math.radians(start_angle)
     ea = math.radians(end_angle)
+    if not all(math.isfinite(v) for v in (cx, cy, r, sa, ea)):
+        return np.empty((0, 2))
     if ea < sa:
         ea += 2 * math.pi
-    angles = np.linspace(sa, ea, max(4, int(pts * abs(ea - sa) / (2 * math.pi))))
-    return [(cx + r * math.cos(a), cy + r * math.sin(a)) for a in angles]
+    # Segments a full circle needs for a chord error (sagitta) below tol_mm.
+    # acos underflows to 0 for very large radii; the floor keeps the division
+    # finite and, together with the cap, bounds the allocation.
+    half_angle = max(math.acos(max(-1.0, 1.0 - tol_mm / max(r, tol_mm))), math.pi / ARC_MAX_SEGMENTS)
+    full_segments = min(ARC_MAX_SEGMENTS, max(8, math.ceil(math.pi / half_angle)))
+    n = max(4, math.ceil(full_segments * abs(ea - sa) / (2 * math.pi)) + 1)
+    return _approx_arc_kernel(float(cx), float(cy), float(r), sa, ea, n)
+
 
+def approx_spline(spline, tol: float) -> np.ndarray:
+    """Flatten ``spline`` into an ``(N, 2)`` array; ``tol`` is in drawing units."""
 
-def approx_spline(spline, tol: float = 0.5) -> List[Point]:
     try:
-        return [(p.x, p.y) for p in spline.flattening(tolerance=tol)]
+        return np.fromiter(
+            ((p.x, p.y) for p in spline.flattening(tol)),
+            dtype=np.dtype((np.float64, 2)),
+        )
     except Exception:
         try:
             cps = spline.control_points
-            return [(float(p[0]), float(p[1])) for p in cps]
+            return np.asarray([(float(p[0]), float(p[1])) for p in cps], dtype=np.float64).reshape(-1, 2)
         except Exception:
-            return []
+            return np.empty((0, 2))
+
+
+def _handle_lwpolyline(entity, scale: float) -> List[PointList]:
+    try:
+        # All vertices in one call instead of a Python loop.
+        pts = np.asarray(entity.get_points("xy"), dtype=np.float64).reshape(-1, 2) * scale
+        closed = bool(entity.closed)
+    except Exception:
+        return []
+    if not len(pts):
+        return []
+    return [(closed, pts, "poly")]
+
+
+def _handle_polyline(entity, scale: float) -> List[PointList]:
+    try:
+        # POLYLINE has no get_points(); points() yields its vertex locations.
+        pts = np.fromiter(
+            ((p.x, p.y) for p in entity.points()),
+            dtype=np.dtype((np.float64, 2)),
+        ) * scale
+        closed = bool(entity.is_closed)
+    except Exception:
+        return []
+    if not len(pts):
+        return []
+    return [(closed, pts, "poly")]
+
+
+def _handle_line(entity, scale: float) -> List[PointList]:
+    try:
+        dxf = entity.dxf
+        start, end = dxf.start, dxf.end
+        pts = np.array([[start.x, start.y], [end.x, end.y]], dtype=np.float64) * scale
+    except Exception:
+        return []
+    return [(False, pts, "line")]
+
+
+def _handle_circle(entity, scale: float) -> List[PointList]:
+    try:
+        dxf = entity.dxf
+        center = dxf.center
+        cx, cy, r = center.x * scale, center.y * scale, dxf.radius * scale
+        pts = approx_arc(cx, cy, r, 0, 360, tol_mm=ARC_TOL_MM)
+    except Exception:
+        return []
+    return [(True, pts, "circle")]
+
+
+def _handle_arc(entity, scale: float) -> List[PointList]:
+    try:
+        dxf = entity.dxf
+        center = dxf.center
+        cx, cy, r = center.x * scale, center.y * scale, dxf.radius * scale
+        sa, ea = dxf.start_angle, dxf.end_angle
+        pts = approx_arc(cx, cy, r, sa, ea, tol_mm=ARC_TOL_MM)
+    except Exception:
+        return []
+    return [(False, pts, "arc")]
+
+
+def _handle_spline(entity, scale: float) -> List[PointList]:
+    # Flattening runs in drawing units; keep the same chord error as arcs in mm.
+    pts = approx_spline(entity, tol=ARC_TOL_MM / scale) * scale
+    if not len(pts):
+        return []
+    closed = bool(len(pts) >= 3 and np.allclose(pts[0], pts[-1], rtol=0.0, atol=1e-6))
+    return [(closed, pts, "spline")]
+
+
+_HANDLERS = {
+    "LWPOLYLINE": _handle_lwpolyline,
+    "POLYLINE": _handle_polyline,
+    "LINE": _handle_line,
+    "CIRCLE": _handle_circle,
+    "ARC": _handle_arc,
+    "SPLINE": _handle_spline,
+}
 
 
 def entity_to_pointlists(entity, scale: float = 1.0) -> List[PointList]:
-    et = entity.dxftype()
-    out: List[PointList] = []
-    if et in ("LWPOLYLINE", "POLYLINE"):
-        pts: List[Point] = []
-        try:
-            for v in entity.get_points():
-                x = float(v[0]) * scale
-                y = float(v[1]) * scale
-                pts.append((x, y))
-        except Exception:
-            try:
-                for v in entity.vertices():
-                    x = float(v.dxf.location.x) * scale
-                    y = float(v.dxf.location.y) * scale
-                    pts.append((x, y))
-            except Exception:
-                pass
-        closed = bool(getattr(entity, "closed", False) or (getattr(entity.dxf, "flag", 0) & 1))
-        if pts:
-            out.append((closed, pts, "poly"))
-    elif et == "LINE":
-        x1, y1 = entity.dxf.start.x * scale, entity.dxf.start.y * scale
-        x2, y2 = entity.dxf.end.x * scale, entity.dxf.end.y * scale
-        out.append((False, [(x1, y1), (x2, y2)], "line"))
-    elif et == "CIRCLE":
-        cx, cy, r = entity.dxf.center.x * scale, entity.dxf.center.y * scale, entity.dxf.radius * scale
-        pts = approx_arc(cx, cy, r, 0, 360, pts=120)
-        out.append((True, pts, "circle"))
-    elif et == "ARC":
-        cx, cy, r = entity.dxf.center.x * scale, entity.dxf.center.y * scale, entity.dxf.radius * scale
-        sa, ea = entity.dxf.start_angle, entity.dxf.end_angle
-        pts = approx_arc(cx, cy, r, sa, ea, pts=120)
-        out.append((False, pts, "arc"))
-    elif et == "SPLINE":
-        pts = approx_spline(entity)
-        pts = [(x * scale, y * scale) for x, y in pts]
-        if pts:
-            closed = bool(len(pts) >= 3 and abs(pts[0][0] - pts[-1][0]) < 1e-6 and abs(pts[0][1] - pts[-1][1]) < 1e-6)
-            out.append((closed, pts, "spline"))
-    return out
+    handler = _HANDLERS.get(entity.dxftype())
+    return handler(entity, scale) if handler else []
 
 
 def parse_dxf(path: Path | str) -> Tuple[List[PointList], float]:
@@ -104,15 +211,13 @@ def parse_dxf(path: Path | str) -> Tuple[List[PointList], float]:
     factor = units_to_mm_factor(ins) or 1.0
     model = doc.modelspace()
     pointlists: List[PointList] = []
+    # Every handler wraps its attribute reads and point generation and returns
+    # [] for a malformed entity, so the loop itself needs no exception handling.
     for entity in model:
-        try:
-            chunk = entity_to_pointlists(entity, scale=factor)
-            for closed, pts, etype in chunk:
-                ptsf = [(float(x), float(y)) for x, y in pts if not (math.isnan(x) or math.isnan(y))]
-                if len(ptsf) >= 2:
-                    pointlists.append((closed, ptsf, etype))
-        except Exception:
-            continue
+        for closed, pts, etype in entity_to_pointlists(entity, scale=factor):
+            arr = _filter_nan(pts)
+            if len(arr) >= 2:
+                pointlists.append((closed, arr, etype))
     return pointlists, factor
 
 
@@ -121,51 +226,66 @@ def build_polygons_with_holes(pointlists: Sequence[PointList]) -> Tuple[List[Pol
     open_lines: List[LineString] = []
     for closed, pts, _ in pointlists:
         if closed:
-            if pts[0] != pts[-1]:
-                pts = list(pts) + [pts[0]]
+            if not np.array_equal(pts[0], pts[-1]):
+                pts = np.vstack([pts, pts[:1]])
             try:
-                ring = LinearRing(pts)
-                if not ring.is_valid:
+                ring = LinearRing(pts).simplify(SIMPLIFY_TOL_MM, preserve_topology=True)
+                if ring.is_empty or not ring.is_valid:
                     continue
+                pts = shapely.get_coordinates(ring)
                 poly = Polygon(ring)
                 if poly.area > 1e-6:
-                    closed_polys.append({"poly": poly, "pts": pts, "area": poly.area})
+                    closed_polys.append({"poly": poly, "pts": pts, "area": poly.area, "prep": prep(poly)})
             except Exception:
                 continue
         else:
             try:
-                open_lines.append(LineString(pts))
+                open_lines.append(LineString(pts).simplify(SIMPLIFY_TOL_MM, preserve_topology=True))
             except Exception:
                 pass
     closed_polys.sort(key=lambda x: x["area"])
     n = len(closed_polys)
     parent: List[Optional[int]] = [None] * n
+    # Contours in a DXF do not overlap, so one interior point is enough to
+    # decide nesting: probe the index with it and keep the smallest container.
+    # A parent's bounding box must also enclose the child's, which rules out
+    # most index hits before any GEOS predicate runs.
+    tree = STRtree([rec["poly"] for rec in closed_polys]) if n else None
+    bounds = np.array([rec["poly"].bounds for rec in closed_polys], dtype=np.float64).reshape(-1, 4)
     for i in range(n):
-        pi = closed_polys[i]["poly"]
-        for j in range(i + 1, n):
-            pj = closed_polys[j]["poly"]
-            if pj.contains(pi):
-                parent[i] = j
+        rp = closed_polys[i]["poly"].representative_point()
+        candidates = tree.query(rp)  # type: ignore[union-attr]
+        candidates = candidates[candidates > i]
+        bi = bounds[i]
+        cb = bounds[candidates]
+        mask = (cb[:, 0] <= bi[0]) & (cb[:, 1] <= bi[1]) & (cb[:, 2] >= bi[2]) & (cb[:, 3] >= bi[3])
+        for j in np.sort(candidates[mask]):
+            if closed_polys[j]["prep"].contains(rp):
+                parent[i] = int(j)
                 break
+    # Parents always sit later in the area order, so walking backwards
+    # resolves every ancestor's root before its descendants need it.
+    root: List[int] = list(range(n))
+    for i in range(n - 1, -1, -1):
+        par = parent[i]
+        if par is not None:
+            root[i] = root[par]
     outers: dict[int, dict[str, object]] = {}
     for i in range(n):
         if parent[i] is None:
             outers[i] = {"outer": closed_polys[i]["poly"], "holes": []}
     for i in range(n):
-        par = parent[i]
-        if par is None:
+        if parent[i] is None:
             continue
-        anc = par
-        while parent[anc] is not None:
-            anc = parent[anc]
+        anc = root[i]
         record = outers.setdefault(anc, {"outer": closed_polys[anc]["poly"], "holes": []})
-        record["holes"].append(list(closed_polys[i]["poly"].exterior.coords))
+        record["holes"].append(closed_polys[i]["pts"])
     polygons_out: List[Polygon] = []
     for idx, rec in outers.items():
         outer_poly = rec["outer"]  # type: ignore[assignment]
-        holes = [list(coords) for coords in rec["holes"]]  # type: ignore[assignment]
+        hole_arrs: List[np.ndarray] = rec["holes"]  # type: ignore[assignment]
         try:
-            polygons_out.append(Polygon(list(outer_poly.exterior.coords), holes=holes))
+            polygons_out.append(Polygon(closed_polys[idx]["pts"], holes=hole_arrs))
         except Exception:
             polygons_out.append(outer_poly)
     return polygons_out, open_lines
@@ -175,21 +295,17 @@ def compute_metrics(polygons_out: Iterable[Polygon], open_lines: Iterable[LineSt
     polygons_out = list(polygons_out)
     open_lines = list(open_lines)
     geom: Optional[BaseGeometry] = unary_union(polygons_out) if polygons_out else None
-    total_length_mm = geom.length if geom is not None else 0.0
-    for ln in open_lines:
-        try:
-            total_length_mm += ln.length
-        except Exception:
-            pass
-    area_mm2 = geom.area if geom is not None else 0.0
+    total_length_mm = float(shapely.length(geom)) if geom is not None else 0.0
+    if open_lines:
+        total_length_mm += float(np.nansum(shapely.length(np.array(open_lines, dtype=object))))
+    area_mm2 = float(shapely.area(geom)) if geom is not None else 0.0
     if geom is not None:
-        minx, miny, maxx, maxy = geom.bounds
+        minx, miny, maxx, maxy = (float(v) for v in shapely.bounds(geom))
     else:
-        xs = [x for ln in open_lines for x, _ in ln.coords]
-        ys = [y for ln in open_lines for _, y in ln.coords]
-        if xs and ys:
-            minx, maxx = min(xs), max(xs)
-            miny, maxy = min(ys), max(ys)
+        all_coords = shapely.get_coordinates(open_lines) if open_lines else np.empty((0, 2))
+        if all_coords.size:
+            minx, miny = (float(v) for v in all_coords.min(axis=0))
+            maxx, maxy = (float(v) for v in all_coords.max(axis=0))
         else:
             minx = miny = maxx = maxy = 0.0
     area_cm2 = area_mm2 / 100.0
@@ -2,10 +2,13 @@
     COOKIES,
     DATA_FILE,
     HEADERS,
+    REFRESH_WORKERS,
     MaterialItem,
+    SearchIndex,
     calc_sale_price,
     fetch_title_and_price,
     load_items,
+    make_session,
     refresh_item,
     refresh_items,
     save_items,
@@ -17,10 +20,13 @@ __all__ = [
     "COOKIES",
     "DATA_FILE",
     "HEADERS",
+    "REFRESH_WORKERS",
     "MaterialItem",
+    "SearchIndex",
     "calc_sale_price",
     "fetch_title_and_price",
     "load_items",
+    "make_session",
     "refresh_item",
     "refresh_items",
     "save_items",
@@ -1,12 +1,24 @@
 ﻿import json
-import math
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, asdict
+from fractions import Fraction
+from functools import lru_cache
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import Iterable, List, Optional, Tuple
 
+import numpy as np
 import requests
+import soupsieve
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; stdlib json produces the same file
+    orjson = None
 
 # Persist settings for the Zenon region we scrape.
 COOKIES = {
@@ -27,6 +39,20 @@ HEADERS = {
 BASE_DIR = Path(__file__).resolve().parent
 DATA_FILE = BASE_DIR / "nomenclature.json"
 
+# Parallel page fetches during a refresh; also the size of the connection pool.
+REFRESH_WORKERS = 8
+
+try:
+    import lxml  # noqa: F401
+
+    _HTML_PARSER = "lxml"
+except ImportError:
+    _HTML_PARSER = "html.parser"
+
+_TITLE_SELECTORS = (soupsieve.compile("h1"), soupsieve.compile(".product__title"))
+_PRICE_SELECTOR = soupsieve.compile(".rub")
+_NON_DIGITS_RE = re.compile(r"\D+")
+
 
 @dataclass
 class MaterialItem:
@@ -60,23 +86,52 @@ def load_items(path: Path | str = DATA_FILE) -> List[MaterialItem]:
     path = Path(path)
     if not path.exists():
         return []
-    with open(path, "r", encoding="utf-8") as fh:
-        payload = json.load(fh)
+    with open(path, "rb") as fh:
+        raw = fh.read()
+    payload = orjson.loads(raw) if orjson is not None else json.loads(raw.decode("utf-8"))
     return [MaterialItem.from_dict(entry) for entry in payload]
 
 
 def save_items(items: Iterable[MaterialItem], path: Path | str = DATA_FILE) -> None:
     path = Path(path)
     payload = [item.to_dict() for item in items]
-    with open(path, "w", encoding="utf-8") as fh:
-        json.dump(payload, fh, ensure_ascii=False, indent=2)
+    if orjson is not None:
+        data = orjson.dumps(payload, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
+    # Write next to the target and swap it in, so a crash mid-save never
+    # leaves a truncated nomenclature file behind.
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp_path, path)
+
+
+def _as_ratio(value: float) -> Tuple[int, int]:
+    if float(value).is_integer():
+        return int(value), 1
+    # Recover the decimal that was entered (0.1, 2.5) rather than its binary expansion.
+    frac = Fraction(value).limit_denominator(10**6)
+    return frac.numerator, frac.denominator
+
+
+@lru_cache(maxsize=1024)
+def _unit_factors(sale_units: float) -> Tuple[int, int]:
+    # price * num / den == price / sale_units * 1.1 / 10. Catalogues reuse a
+    # handful of sale counts, so the ratio work runs once per distinct value.
+    u_num, u_den = _as_ratio(sale_units)
+    return 11 * u_den, 100 * u_num
 
 
 def calc_sale_price(purchase_price: float, sale_units: float) -> int:
     if not sale_units:
         return 0
-    raw_price = (purchase_price / sale_units) * 1.1
-    return int(math.ceil(raw_price / 10.0) * 10)
+    # (price / units) * 1.1, rounded up to the next 10, without touching floats.
+    num, den = _unit_factors(sale_units)
+    if type(purchase_price) is not int:
+        p_num, p_den = _as_ratio(purchase_price)
+        return -(-(p_num * num) // (p_den * den)) * 10
+    return -(-(purchase_price * num) // den) * 10
 
 
 def fetch_title_and_price(url: str, *, session: Optional[requests.Session] = None) -> tuple[Optional[str], Optional[int]]:
@@ -84,13 +139,13 @@ def fetch_title_and_price(url: str, *, session: Optional[requests.Session] = Non
     response = client.get(url, headers=HEADERS, cookies=COOKIES, timeout=20)
     if response.status_code != 200:
         return None, None
-    soup = BeautifulSoup(response.text, "html.parser")
-    title_node = soup.select_one("h1") or soup.select_one(".product__title")
+    soup = BeautifulSoup(response.text, _HTML_PARSER)
+    title_node = _TITLE_SELECTORS[0].select_one(soup) or _TITLE_SELECTORS[1].select_one(soup)
     title = title_node.get_text(strip=True) if title_node else None
-    price_tags = [tag.get_text(strip=True) for tag in soup.select(".rub")]
+    price_tags = [tag.get_text(strip=True) for tag in _PRICE_SELECTOR.select(soup)]
     prices: List[int] = []
     for text in price_tags:
-        digits = "".join(ch for ch in text if ch.isdigit())
+        digits = _NON_DIGITS_RE.sub("", text)
         if digits:
             prices.append(int(digits))
     return title, max(prices) if prices else None
@@ -111,13 +166,57 @@ def refresh_item(item: MaterialItem, *, session: Optional[requests.Session] = No
     return True
 
 
-def refresh_items(items: Iterable[MaterialItem], *, session: Optional[requests.Session] = None) -> List[MaterialItem]:
-    updated: List[MaterialItem] = []
-    for item in items:
-        refreshed = refresh_item(item, session=session)
-        if refreshed:
-            updated.append(item)
-    return updated
+def make_session(pool_size: int = REFRESH_WORKERS) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(total=3, backoff_factor=0.3),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def refresh_items(
+    items: Iterable[MaterialItem],
+    *,
+    session: Optional[requests.Session] = None,
+    max_workers: int = REFRESH_WORKERS,
+) -> List[MaterialItem]:
+    items = list(items)
+    if not items:
+        return []
+    client = session or make_session(max_workers)
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            refreshed = list(executor.map(lambda it: refresh_item(it, session=client), items))
+    finally:
+        if session is None:
+            client.close()
+    return [item for item, ok in zip(items, refreshed) if ok]
+
+
+class SearchIndex:
+    """Snapshot of item names, lowercased once, for repeated substring search.
+
+    The index reflects the items as they were when it was built; rebuild it
+    after the catalogue is reloaded, refreshed or edited.
+    """
+
+    def __init__(self, items: Iterable[MaterialItem]) -> None:
+        self._items = tuple(items)
+        self._lowered = np.char.lower(np.asarray([item.name for item in self._items], dtype=str))
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def search(self, query: str) -> List[MaterialItem]:
+        q = query.lower().strip()
+        if not q or not self._items:
+            return []
+        mask = np.char.find(self._lowered, q) >= 0
+        return [self._items[i] for i in np.flatnonzero(mask)]
 
 
 def search_items(items: Iterable[MaterialItem], query: str) -> List[MaterialItem]:
@@ -131,10 +230,13 @@ __all__ = [
     "COOKIES",
     "HEADERS",
     "DATA_FILE",
+    "REFRESH_WORKERS",
     "MaterialItem",
+    "SearchIndex",
     "calc_sale_price",
     "fetch_title_and_price",
     "load_items",
+    "make_session",
     "save_items",
     "refresh_item",
     "refresh_items",
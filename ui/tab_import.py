@@ -1,8 +1,9 @@
 ﻿from __future__ import annotations
 
+from functools import lru_cache
 from pathlib import Path
 
-from PySide6.QtCore import Signal
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
 from PySide6.QtWidgets import (
     QFileDialog,
     QFormLayout,
@@ -19,6 +20,42 @@ from core.dxf_core import DXFAnalysisResult, analyze_dxf
 from .widgets import DxfPreviewWidget
 
 
+@lru_cache(maxsize=16)
+def _analyze_cached(path_str: str, mtime_ns: int, size: int) -> DXFAnalysisResult:
+    # mtime/size are part of the key only so an edited file is re-analysed.
+    return analyze_dxf(Path(path_str))
+
+
+def analyze_dxf_cached(path: Path) -> DXFAnalysisResult:
+    """Return the analysis of ``path``, reusing it while the file is unchanged."""
+
+    resolved = path.resolve()
+    st = resolved.stat()
+    return _analyze_cached(str(resolved), st.st_mtime_ns, st.st_size)
+
+
+class _AnalysisSignals(QObject):
+    finished = Signal(object)  # emits DXFAnalysisResult
+    failed = Signal(str)
+
+
+class DxfAnalysisRunnable(QRunnable):
+    """Run :func:`analyze_dxf_cached` on a thread-pool worker and report back via signals."""
+
+    def __init__(self, path: Path) -> None:
+        super().__init__()
+        self._path = path
+        self.signals = _AnalysisSignals()
+
+    def run(self) -> None:
+        try:
+            result = analyze_dxf_cached(self._path)
+        except Exception as exc:  # pylint: disable=broad-except
+            self.signals.failed.emit(str(exc))
+            return
+        self.signals.finished.emit(result)
+
+
 class DxfImportTab(QWidget):
     """Tab that lets the user load a DXF file and view calculated metrics."""
 
@@ -28,6 +65,9 @@ class DxfImportTab(QWidget):
         super().__init__(parent)
 
         self._result: DXFAnalysisResult | None = None
+        self._runnable: DxfAnalysisRunnable | None = None
+        self._previous_path_text = ""
+        self._select_btn = QPushButton("Выбрать DXF файл…")
         self._path_label = QLabel("Файл не выбран")
         self._path_label.setWordWrap(True)
 
@@ -44,9 +84,8 @@ class DxfImportTab(QWidget):
     def _setup_ui(self) -> None:
         layout = QVBoxLayout(self)
 
-        select_btn = QPushButton("Выбрать DXF файл…")
-        select_btn.clicked.connect(self._handle_select_clicked)
-        layout.addWidget(select_btn)
+        self._select_btn.clicked.connect(self._handle_select_clicked)
+        layout.addWidget(self._select_btn)
 
         layout.addWidget(self._path_label)
 
@@ -77,20 +116,34 @@ class DxfImportTab(QWidget):
             return
 
         path_obj = Path(file_path)
-        try:
-            result = analyze_dxf(path_obj)
-        except Exception as exc:  # pylint: disable=broad-except
-            QMessageBox.critical(
-                self,
-                "Ошибка анализа",
-                f"Не удалось обработать файл:\n{exc}",
-            )
-            return
-
+        runnable = DxfAnalysisRunnable(path_obj)
+        runnable.signals.finished.connect(self._handle_analysis_finished)
+        runnable.signals.failed.connect(self._handle_analysis_failed)
+        # Keep a reference so the signals object outlives the worker.
+        self._runnable = runnable
+
+        self._previous_path_text = self._path_label.text()
+        self._select_btn.setEnabled(False)
+        self._path_label.setText(f"Анализ… {path_obj.name}")
+        QThreadPool.globalInstance().start(runnable)
+
+    def _handle_analysis_finished(self, result: DXFAnalysisResult) -> None:
+        self._runnable = None
+        self._select_btn.setEnabled(True)
         self._result = result
         self._update_metrics(result)
         self.dxf_loaded.emit(result)
 
+    def _handle_analysis_failed(self, message: str) -> None:
+        self._runnable = None
+        self._select_btn.setEnabled(True)
+        self._path_label.setText(self._previous_path_text)
+        QMessageBox.critical(
+            self,
+            "Ошибка анализа",
+            f"Не удалось обработать файл:\n{message}",
+        )
+
     def _update_metrics(self, result: DXFAnalysisResult) -> None:
         self._path_label.setText(
             f"Загружен файл: {result.source_path.name} (путь: {result.source_path})"
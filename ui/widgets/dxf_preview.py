@@ -1,30 +1,76 @@
 ﻿from __future__ import annotations
 
-from typing import Iterable, Optional, Tuple
+from typing import Iterable, List, Optional, Tuple
 
-from PySide6.QtCore import QPointF, Qt
+import numpy as np
+import shapely
+from PySide6.QtCore import QPointF, QRectF, Qt
 from PySide6.QtGui import QColor, QPainter, QPainterPath, QPen, QPolygonF
 from PySide6.QtWidgets import QWidget
 
 from core.dxf_core import DXFAnalysisResult
 
 Bounds = Tuple[float, float, float, float]
+# Each cached shape carries its bounding rect so culling needs no Qt pass
+# over the vertices at paint time.
+BoundedPath = Tuple[QPainterPath, QRectF]
+BoundedPolyline = Tuple[QPolygonF, QRectF]
+PolygonPaths = Tuple[BoundedPath, List[BoundedPath]]
 
 
 class DxfPreviewWidget(QWidget):
     """Simple canvas that renders the outline of the analysed DXF file."""
 
+    _MARGIN = 12.0
+
     def __init__(self, parent: Optional[QWidget] = None) -> None:
         super().__init__(parent)
         self._result: Optional[DXFAnalysisResult] = None
         self._bounds: Optional[Bounds] = None
+        self._poly_paths: List[PolygonPaths] = []
+        self._open_polylines: List[BoundedPolyline] = []
+        self._paths_scale = 0.0
         self.setMinimumHeight(260)
 
     def set_result(self, result: Optional[DXFAnalysisResult]) -> None:
         self._result = result
         self._bounds = self._compute_bounds(result)
+        self._build_paths(self._view_scale())
         self.update()
 
+    def _view_scale(self) -> float:
+        if not self._bounds:
+            return 1.0
+        minx, miny, maxx, maxy = self._bounds
+        width = maxx - minx or 1.0
+        height = maxy - miny or 1.0
+        available_width = max(1.0, self.width() - 2 * self._MARGIN)
+        available_height = max(1.0, self.height() - 2 * self._MARGIN)
+        return min(available_width / width, available_height / height)
+
+    def _build_paths(self, scale: float) -> None:
+        # Geometry is fixed per result, so the Qt paths are built once and
+        # paintEvent only applies the view transform. Rings are simplified to
+        # half a screen pixel, which is invisible at the scale they were built for.
+        self._poly_paths = []
+        self._open_polylines = []
+        self._paths_scale = scale
+        if self._result is None:
+            return
+        tolerance = 0.5 / scale
+        for polygon in self._result.polygons:
+            exterior_path = self._coords_to_path(self._simplified(polygon.exterior, tolerance))
+            hole_paths = [self._coords_to_path(self._simplified(interior, tolerance)) for interior in polygon.interiors]
+            self._poly_paths.append(
+                (
+                    (exterior_path, exterior_path.boundingRect()),
+                    [(hole_path, hole_path.boundingRect()) for hole_path in hole_paths],
+                )
+            )
+        for line in self._result.open_lines:
+            polyline = self._coords_to_polygon(self._simplified(line, tolerance))
+            self._open_polylines.append((polyline, polyline.boundingRect()))
+
     def paintEvent(self, event) -> None:  # type: ignore[override]
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing, True)
@@ -36,56 +82,77 @@ class DxfPreviewWidget(QWidget):
             return
 
         minx, miny, maxx, maxy = self._bounds
-        width = maxx - minx or 1.0
-        height = maxy - miny or 1.0
-
-        margin = 12.0
-        available_width = max(1.0, self.width() - 2 * margin)
-        available_height = max(1.0, self.height() - 2 * margin)
-        scale = min(available_width / width, available_height / height)
+        scale = self._view_scale()
+        # Zooming in past the simplification tolerance would show facets.
+        if scale > 2 * self._paths_scale:
+            self._build_paths(scale)
 
+        margin = self._MARGIN
         painter.translate(margin, margin)
         painter.scale(scale, scale)
         painter.translate(-minx, -miny)
         painter.scale(1, -1)
         painter.translate(0, -(miny + maxy))
 
-        self._draw_polygons(painter)
-        self._draw_open_lines(painter)
+        visible = painter.transform().inverted()[0].mapRect(QRectF(self.rect()))
+        self._draw_polygons(painter, visible, scale)
+        self._draw_open_lines(painter, visible, scale)
 
-    def _draw_polygons(self, painter: QPainter) -> None:
+    def _draw_polygons(self, painter: QPainter, visible: QRectF, scale: float) -> None:
         painter.setPen(QPen(Qt.black, 0))
         fill_brush = QColor("#87CEFA")
 
-        for polygon in self._result.polygons:  # type: ignore[union-attr]
-            exterior_path = self._coords_to_path(polygon.exterior.coords)
+        for (exterior_path, exterior_rect), hole_paths in self._poly_paths:
+            if not self._is_drawable(exterior_rect, visible, scale):
+                continue
             painter.fillPath(exterior_path, fill_brush)
             painter.drawPath(exterior_path)
 
-            for interior in polygon.interiors:
-                hole_path = self._coords_to_path(interior.coords)
+            for hole_path, hole_rect in hole_paths:
+                if not self._is_drawable(hole_rect, visible, scale):
+                    continue
                 painter.fillPath(hole_path, Qt.white)
                 painter.drawPath(hole_path)
 
-    def _draw_open_lines(self, painter: QPainter) -> None:
+    def _draw_open_lines(self, painter: QPainter, visible: QRectF, scale: float) -> None:
         line_pen = QPen(Qt.darkGray, 0)
         painter.setPen(line_pen)
 
-        for line in self._result.open_lines:  # type: ignore[union-attr]
-            polyline = QPolygonF([QPointF(x, y) for x, y in line.coords])
-            painter.drawPolyline(polyline)
+        for polyline, rect in self._open_polylines:
+            if self._is_drawable(rect, visible, scale):
+                painter.drawPolyline(polyline)
+
+    @staticmethod
+    def _is_drawable(rect: QRectF, visible: QRectF, scale: float) -> bool:
+        """Skip shapes that are sub-pixel on screen or entirely outside the viewport."""
+
+        if rect.width() * scale < 1.0 and rect.height() * scale < 1.0:
+            return False
+        # Compared by hand: QRectF.intersects() rejects zero-height rects such
+        # as a horizontal line.
+        return (
+            rect.right() >= visible.left()
+            and rect.left() <= visible.right()
+            and rect.bottom() >= visible.top()
+            and rect.top() <= visible.bottom()
+        )
 
     @staticmethod
-    def _coords_to_path(coords: Iterable[Tuple[float, float]]) -> QPainterPath:
+    def _simplified(geom, tolerance: float) -> np.ndarray:
+        return shapely.get_coordinates(shapely.simplify(geom, tolerance, preserve_topology=False))
+
+    @staticmethod
+    def _coords_to_polygon(coords: Iterable[Tuple[float, float]]) -> QPolygonF:
+        arr = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        return QPolygonF([QPointF(x, y) for x, y in arr.tolist()])
+
+    @classmethod
+    def _coords_to_path(cls, coords: Iterable[Tuple[float, float]]) -> QPainterPath:
         path = QPainterPath()
-        iterator = iter(coords)
-        try:
-            first = next(iterator)
-        except StopIteration:
+        polygon = cls._coords_to_polygon(coords)
+        if polygon.isEmpty():
             return path
-        path.moveTo(*first)
-        for x, y in iterator:
-            path.lineTo(x, y)
+        path.addPolygon(polygon)
         path.closeSubpath()
         return path
 